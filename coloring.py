@@ -8,8 +8,108 @@ Graph coloring algorithms for COMP 6651 Project:
 """
 
 import random
-import heapq
-from collections import deque
+
+import numpy as np
+from numba import njit, types
+from numba.core import cgutils
+from numba.extending import intrinsic
+from llvmlite import ir
+
+
+@intrinsic
+def _ctz64(typingctx, x):
+    """
+    Count trailing zeros of a uint64 via the llvm.cttz intrinsic
+    (a single TZCNT instruction on x86). Returns 64 for input 0.
+    """
+    sig = types.uint64(types.uint64)
+
+    def codegen(context, builder, signature, args):
+        i64 = ir.IntType(64)
+        i1 = ir.IntType(1)
+        fnty = ir.FunctionType(i64, [i64, i1])
+        fn = cgutils.get_or_insert_function(builder.module, fnty,
+                                            "llvm.cttz.i64")
+        return builder.call(fn, [args[0], i1(0)])
+
+    return sig, codegen
+
+
+@njit(cache=True)
+def _first_fit_csr(indptr, indices, order, color, used_wide):
+    """
+    Greedy FirstFit over a CSR graph, compiled with Numba.
+
+    Colors vertices in the given presentation order, assigning each the
+    smallest color not used by an already-colored neighbour. color[v] == 0
+    means "not yet revealed"; assigned colors start at 1.
+
+    Neighbour colors below 64 are collected in a uint64 bitmask and the
+    smallest missing color is a single count-trailing-zeros of the
+    complement; a boolean scratch bitmap handles the rare vertices whose
+    first 63 colors are all taken.
+
+    Args:
+        indptr, indices: CSR adjacency arrays (int32)
+        order: Vertices in presentation order (int32)
+        color: Output array of length n+1, zero-initialized (int32)
+        used_wide: Boolean scratch of length n+2, all False. Passed in so
+            batch callers can reuse one buffer across trials; the wide
+            path clears only the entries it set (a second neighbour
+            walk), so it is returned all False and reset cost stays
+            O(deg(v)) rather than O(max color).
+
+    Returns:
+        int: Largest color used
+    """
+    one = np.uint64(1)
+    current_max = 0
+    for i in range(order.shape[0]):
+        v = order[i]
+        used = one  # Bit 0 pre-set: colors start at 1
+        for j in range(indptr[v], indptr[v + 1]):
+            cu = color[indices[j]]
+            if 0 < cu < 64:
+                used |= one << np.uint64(cu)
+        c = int(_ctz64(~used))
+        if c >= 64:
+            # Colors 1..63 all taken: fall back to the scratch bitmap,
+            # scanning upward from 64
+            for j in range(indptr[v], indptr[v + 1]):
+                cu = color[indices[j]]
+                if cu != 0:
+                    used_wide[cu] = True
+            c = 64
+            while used_wide[c]:
+                c += 1
+            for j in range(indptr[v], indptr[v + 1]):
+                cu = color[indices[j]]
+                if cu != 0:
+                    used_wide[cu] = False
+        color[v] = c
+        if c > current_max:
+            current_max = c
+    return current_max
+
+
+@njit(cache=True)
+def _proper_coloring_csr(indptr, indices, color):
+    """
+    Check that a dense coloring is proper over a CSR graph: no edge joins
+    two equal nonzero colors. Compiled so validation can run inside other
+    nopython code (see simulate.py).
+
+    Returns:
+        bool: True if the coloring is proper
+    """
+    for v in range(1, color.shape[0]):
+        cv = color[v]
+        if cv == 0:
+            continue
+        for j in range(indptr[v], indptr[v + 1]):
+            if color[indices[j]] == cv:
+                return False
+    return True
 
 
 def validate_coloring(graph, coloring):
@@ -18,60 +118,64 @@ def validate_coloring(graph, coloring):
     
     Args:
         graph: Graph object
-        coloring: Dictionary mapping vertex -> color (positive integers)
+        coloring: int32 array of length n+1 mapping vertex -> color
+            (positive integers; entry 0 unused, 0 means uncolored)
         
     Returns:
         (bool, str): (is_valid, message)
     """
-    for v in graph.vertices():
-        for u in graph.neighbours(v):
-            cv = coloring.get(v)
-            cu = coloring.get(u)
-            if cv is None or cu is None:
-                continue
-            if cv == cu:
-                return False, f"Adjacent vertices {v} and {u} both have color {cv}"
-    
+    graph.finalize()
+    coloring = np.asarray(coloring)
+
+    # One C-level comparison over every CSR edge instead of a Python loop:
+    # expand row indices, then check for any edge joining equal nonzero
+    # colors (each undirected edge is checked twice, which is harmless)
+    src = np.repeat(np.arange(graph.n + 1, dtype=np.int32),
+                    np.diff(graph.indptr))
+    cu = coloring[src]
+    cv = coloring[graph.indices]
+    bad = np.flatnonzero((cu == cv) & (cu != 0))
+    if bad.size:
+        u = int(src[bad[0]])
+        v = int(graph.indices[bad[0]])
+        return False, f"Adjacent vertices {u} and {v} both have color {int(cu[bad[0]])}"
+
     return True, "Valid coloring"
 
 
 # ==================== FirstFit (Random Order) ====================
 
-def first_fit(graph, rng_seed=None):
+def first_fit(graph, rng=None, rng_seed=None):
     """
     Standard FirstFit greedy online coloring algorithm.
-    
+
     For random presentation order σ:
         Assign each vertex the smallest color not used by revealed neighbors.
-    
+
     Args:
         graph: Graph object
-        rng_seed: Optional random seed for reproducibility
-        
+        rng: Optional np.random.Generator for the presentation order;
+            callers running many trials can reuse one instead of
+            reseeding per call
+        rng_seed: Optional stdlib random seed (ignored when rng is given)
+
     Returns:
-        dict: vertex -> color (positive integers)
+        np.ndarray: int32 colors indexed by vertex (entry 0 unused)
     """
-    if rng_seed is not None:
-        random.seed(rng_seed)
-    
-    vertices = graph.vertices()
-    random.shuffle(vertices)  # Random online order
-    
-    color = {v: None for v in vertices}
-    revealed = set()
-    
-    for v in vertices:
-        neighbours_revealed = [u for u in graph.neighbours(v) if u in revealed]
-        used_colors = set(color[u] for u in neighbours_revealed if color[u] is not None)
-        
-        # Find smallest available color
-        c = 1
-        while c in used_colors:
-            c += 1
-        
-        color[v] = c
-        revealed.add(v)
-    
+    graph.finalize()
+    if rng is not None:
+        # Vectorized C shuffle of 1..n
+        order = (rng.permutation(graph.n) + 1).astype(np.int32)
+    else:
+        if rng_seed is not None:
+            random.seed(rng_seed)
+        vertices = graph.vertices()
+        random.shuffle(vertices)  # Random online order
+        order = np.asarray(vertices, dtype=np.int32)
+    color = np.zeros(graph.n + 1, dtype=np.int32)
+    scratch = np.zeros(graph.n + 2, dtype=np.bool_)
+    _first_fit_csr(graph.indptr, graph.indices, order, color, scratch)
+
     return color
 
 
@@ -89,73 +193,124 @@ def first_fit_degree(graph):
         graph: Graph object
         
     Returns:
-        dict: vertex -> color (positive integers)
+        np.ndarray: int32 colors indexed by vertex (entry 0 unused)
     """
-    vertices = graph.vertices()
-    # Sort by degree (descending)
-    vertices.sort(key=lambda v: len(graph.neighbours(v)), reverse=True)
-    
-    color = {v: None for v in vertices}
-    revealed = set()
-    
-    for v in vertices:
-        neighbours_revealed = [u for u in graph.neighbours(v) if u in revealed]
-        used_colors = set(color[u] for u in neighbours_revealed if color[u] is not None)
-        
-        c = 1
-        while c in used_colors:
-            c += 1
-        
-        color[v] = c
-        revealed.add(v)
-    
+    graph.finalize()
+    # Sort by degree (descending) with one C-level argsort; the stable kind
+    # keeps ties in ascending vertex order like the old list sort
+    order = (np.argsort(-graph.degrees[1:], kind="stable") + 1).astype(np.int32)
+    color = np.zeros(graph.n + 1, dtype=np.int32)
+    scratch = np.zeros(graph.n + 2, dtype=np.bool_)
+    _first_fit_csr(graph.indptr, graph.indices, order, color, scratch)
+
     return color
 
 
 # ==================== FirstFit + Smallest-Last Heuristic ====================
 
+@njit(cache=True)
+def _smallest_last_csr(indptr, indices, n, deg):
+    """
+    Compute the strict min-degree removal order over a CSR graph with a
+    bucket queue (Matula-Beck), compiled with Numba.
+
+    Vertices are kept in one intrusive doubly-linked list per residual
+    degree. Each removal pops from the lowest nonempty bucket, tracked by
+    a min-degree cursor; every surviving neighbour is then moved down one
+    bucket, and the cursor steps back down when a neighbour drops below
+    it. All operations are O(1), giving O(V+E) total. Unlike the
+    Batagelj-Zaversnik core-decomposition scan (which never decrements a
+    degree below the current removal degree and so only yields a
+    degeneracy ordering), this removes a true minimum-degree vertex at
+    every step.
+
+    Args:
+        indptr, indices: CSR adjacency arrays (int32)
+        n: Number of vertices
+        deg: int32 working array of vertex degrees, indexed by vertex
+            (length n+1). Consumed: holds residual degrees on return.
+
+    Returns:
+        int32 array: Vertices in order of removal (min-degree first)
+    """
+    max_deg = 0
+    for v in range(1, n + 1):
+        if deg[v] > max_deg:
+            max_deg = deg[v]
+
+    # Bucket lists: head[d] is the first vertex of residual degree d,
+    # chained through nxt/prv (-1 terminated). Pushing in reverse vertex
+    # order keeps each initial list in ascending label order.
+    head = np.full(max_deg + 1, -1, dtype=np.int32)
+    nxt = np.empty(n + 1, dtype=np.int32)
+    prv = np.empty(n + 1, dtype=np.int32)
+    for v in range(n, 0, -1):
+        d = deg[v]
+        nxt[v] = head[d]
+        prv[v] = -1
+        if head[d] != -1:
+            prv[head[d]] = v
+        head[d] = v
+
+    removed = np.zeros(n + 1, dtype=np.bool_)
+    removal = np.empty(n, dtype=np.int32)
+    md = 0  # Min-degree cursor: lowest possibly-nonempty bucket
+    for i in range(n):
+        while head[md] == -1:
+            md += 1
+        v = head[md]
+        head[md] = nxt[v]
+        if nxt[v] != -1:
+            prv[nxt[v]] = -1
+        removed[v] = True
+        removal[i] = v
+
+        for j in range(indptr[v], indptr[v + 1]):
+            u = indices[j]
+            if removed[u]:
+                continue
+            # Unlink u from its bucket and relink one bucket down
+            du = deg[u]
+            if prv[u] != -1:
+                nxt[prv[u]] = nxt[u]
+            else:
+                head[du] = nxt[u]
+            if nxt[u] != -1:
+                prv[nxt[u]] = prv[u]
+
+            du -= 1
+            deg[u] = du
+            nxt[u] = head[du]
+            prv[u] = -1
+            if head[du] != -1:
+                prv[head[du]] = u
+            head[du] = u
+            if du < md:
+                md = du
+    return removal
+
+
 def _smallest_last_ordering(graph):
     """
-    Compute smallest-last vertex ordering using a min-heap.
-    
+    Compute smallest-last vertex ordering via the bucket-queue kernel.
+
     Algorithm:
         Repeatedly remove vertex of minimum degree, tracking order.
         Return vertices in reverse order of removal.
-    
-    Time complexity: O(V log V + E)
-    
+
+    Time complexity: O(V + E)
+
     Args:
         graph: Graph object
-        
+
     Returns:
-        list: Vertices in smallest-last order
+        int32 array: Vertices in smallest-last order
     """
-    degrees = {v: len(graph.neighbours(v)) for v in graph.vertices()}
-    removed = set()
-    order = []
-    
-    # Min-heap: (degree, vertex)
-    heap = [(degrees[v], v) for v in graph.vertices()]
-    heapq.heapify(heap)
-    
-    while heap:
-        deg, v = heapq.heappop(heap)
-        
-        if v in removed:
-            continue
-        
-        removed.add(v)
-        order.append(v)
-        
-        # Update degrees of neighbors and add to heap
-        for u in graph.neighbours(v):
-            if u not in removed:
-                degrees[u] -= 1
-                heapq.heappush(heap, (degrees[u], u))
-    
+    graph.finalize()
+    removal = _smallest_last_csr(graph.indptr, graph.indices, graph.n,
+                                 graph.degrees.copy())
     # Reverse order: smallest-last becomes largest-first for coloring
-    order.reverse()
-    return order
+    return removal[::-1].copy()
 
 
 def first_fit_smallest_last(graph):
@@ -169,125 +324,201 @@ def first_fit_smallest_last(graph):
         graph: Graph object
         
     Returns:
-        dict: vertex -> color (positive integers)
+        np.ndarray: int32 colors indexed by vertex (entry 0 unused)
     """
     vertices = _smallest_last_ordering(graph)
-    
-    color = {v: None for v in vertices}
-    revealed = set()
-    
-    for v in vertices:
-        neighbours_revealed = [u for u in graph.neighbours(v) if u in revealed]
-        used_colors = set(color[u] for u in neighbours_revealed if color[u] is not None)
-        
-        c = 1
-        while c in used_colors:
-            c += 1
-        
-        color[v] = c
-        revealed.add(v)
-    
+
+    graph.finalize()
+    order = np.asarray(vertices, dtype=np.int32)
+    color = np.zeros(graph.n + 1, dtype=np.int32)
+    scratch = np.zeros(graph.n + 2, dtype=np.bool_)
+    _first_fit_csr(graph.indptr, graph.indices, order, color, scratch)
+
     return color
 
 
+# ==================== Fused FirstFit-variant kernel ====================
+
+@njit(cache=True)
+def _color_all_three(indptr, indices, n, order_random,
+                     color_p, color_d, color_s, used_wide):
+    """
+    Run all three FirstFit variants over one CSR graph in a single
+    compiled call, sharing the degree array between the degree ordering
+    and the smallest-last bucket queue.
+
+    The caller supplies the random presentation order (so it controls the
+    RNG stream) plus the three color buffers and the wide-path scratch;
+    buffers are zeroed here.
+
+    Args:
+        indptr, indices: CSR adjacency arrays (int32)
+        n: Number of vertices
+        order_random: Random presentation order for plain FirstFit (int32)
+        color_p, color_d, color_s: int32 color buffers of length n+1 for
+            the plain, degree and smallest-last variants
+        used_wide: Boolean scratch of length n+2, all False (returned
+            all False, as for _first_fit_csr)
+
+    Returns:
+        tuple: (max_plain, max_deg, max_sl) largest colors used
+    """
+    deg = np.empty(n + 1, dtype=np.int32)
+    deg[0] = 0
+    for v in range(1, n + 1):
+        deg[v] = indptr[v + 1] - indptr[v]
+
+    # Degree ordering (stable sort keeps ties in ascending vertex order)
+    order_deg = (np.argsort(-deg[1:], kind="mergesort") + 1).astype(np.int32)
+    # Smallest-last ordering; the bucket queue consumes its degree copy
+    removal = _smallest_last_csr(indptr, indices, n, deg.copy())
+    order_sl = removal[::-1].copy()
+
+    color_p[:] = 0
+    mx_p = _first_fit_csr(indptr, indices, order_random, color_p, used_wide)
+    color_d[:] = 0
+    mx_d = _first_fit_csr(indptr, indices, order_deg, color_d, used_wide)
+    color_s[:] = 0
+    mx_s = _first_fit_csr(indptr, indices, order_sl, color_s, used_wide)
+    return mx_p, mx_d, mx_s
+
+
 # ==================== CBIP (k=2 only) ====================
 
+def _find(parent, parity, x):
+    """
+    Union-find lookup with parity tracking and path compression.
+
+    Args:
+        parent: Parent array of the union-find forest
+        parity: Parity of each node relative to its parent (0/1)
+        x: Node to look up
+
+    Returns:
+        (root, p): Root of x's component and parity of x relative to it
+    """
+    root = x
+    p = 0
+    while parent[root] != root:
+        p ^= parity[root]
+        root = parent[root]
+
+    # Second pass: point every node on the path directly at the root
+    cur = x
+    cur_p = p
+    while parent[cur] != root:
+        nxt = parent[cur]
+        nxt_p = cur_p ^ parity[cur]
+        parent[cur] = root
+        parity[cur] = cur_p
+        cur = nxt
+        cur_p = nxt_p
+
+    return root, p
+
+
 def cbip(graph, rng_seed=None):
     """
     CBIP (Coloring Based on Interval Partitioning) for bipartite graphs.
-    
+
     For each vertex v in random online order:
         1. Consider induced graph on {v} ∪ revealed vertices
         2. Find connected component of v in this induced graph
         3. Bipartition component into (A, B) with v ∈ A
         4. Color v with smallest color NOT used in B (opposite partition)
-    
+
+    On a bipartite graph the bipartition of a connected component is
+    unique, so instead of re-running BFS per vertex the component sides
+    are maintained incrementally: a union-find forest with edge parities
+    tracks each revealed vertex's side, and per-component bitmasks record
+    the colors used on each side. Arriving vertices cost
+    O(deg(v) * alpha(n)) instead of a BFS over the revealed subgraph.
+
     This guarantees proper coloring if the graph is bipartite.
-    
+
     Args:
         graph: Graph object (must be bipartite/2-colourable)
         rng_seed: Optional random seed for reproducibility
-        
+
     Returns:
-        dict: vertex -> color (positive integers)
-        
+        np.ndarray: int32 colors indexed by vertex (entry 0 unused)
+
     Raises:
         RuntimeError: If graph is not bipartite
     """
     if rng_seed is not None:
         random.seed(rng_seed)
-    
+
     vertices = graph.vertices()
     random.shuffle(vertices)  # Random online order
-    
-    color = {}
-    revealed = set()
-    
+
+    graph.finalize()
+    n = graph.n
+
+    parent = np.arange(n + 1, dtype=np.int32)
+    parity = np.zeros(n + 1, dtype=np.int8)   # Side relative to parent
+    revealed = np.zeros(n + 1, dtype=np.bool_)
+    color = np.zeros(n + 1, dtype=np.int32)
+    # Per-component color bitmasks, indexed by root: bit c set means color c
+    # is used on that parity side of the component. These stay Python ints
+    # (arbitrary precision), so a plain list holds them.
+    mask_side0 = [0] * (n + 1)
+    mask_side1 = [0] * (n + 1)
+
     for v in vertices:
-        # First vertex: trivial case
-        if not revealed:
+        nbrs = graph.neighbours(v)
+        revealed_neighbours = nbrs[revealed[nbrs]]
+
+        # First vertex of its component: trivial case
+        if revealed_neighbours.size == 0:
+            revealed[v] = True
             color[v] = 1
-            revealed.add(v)
+            mask_side0[v] = 1 << 1
             continue
-        
-        # Allowed vertices for component: revealed vertices + v
-        allowed = set(revealed)
-        allowed.add(v)
-        
-        # Step 1: Find connected component of v in induced subgraph
-        component = set([v])
-        queue = deque([v])
-        
-        while queue:
-            x = queue.popleft()
-            for u in graph.neighbours(x):
-                if u in allowed and u not in component:
-                    component.add(u)
-                    queue.append(u)
-        
-        # Step 2: Bipartition component with v fixed in partition A
-        A = set([v])
-        B = set()
-        side = {v: 0}  # 0 -> A, 1 -> B
-        
-        queue = deque([v])
-        is_bipartite = True
-        
-        while queue:
-            x = queue.popleft()
-            for u in graph.neighbours(x):
-                if u not in component:
-                    continue
-                
-                if u not in side:
-                    # Assign opposite partition
-                    side[u] = 1 - side[x]
-                    if side[u] == 0:
-                        A.add(u)
-                    else:
-                        B.add(u)
-                    queue.append(u)
+
+        # Attach v on the opposite side of its first revealed neighbour
+        u0 = revealed_neighbours[0]
+        r0, p0 = _find(parent, parity, u0)
+        parent[v] = r0
+        parity[v] = p0 ^ 1
+        revealed[v] = True
+
+        # Merge any other components v connects to, orienting their sides
+        # so that each neighbour ends up opposite v
+        for u in revealed_neighbours[1:]:
+            ru, pu = _find(parent, parity, u)
+            rv, pv = _find(parent, parity, v)
+            if ru != rv:
+                offset = pv ^ 1 ^ pu
+                parent[ru] = rv
+                parity[ru] = offset
+                if offset == 0:
+                    mask_side0[rv] |= mask_side0[ru]
+                    mask_side1[rv] |= mask_side1[ru]
                 else:
-                    # Check bipartiteness constraint
-                    if side[u] == side[x]:
-                        is_bipartite = False
-        
-        if not is_bipartite:
-            raise RuntimeError(
-                f"Graph is not bipartite (odd cycle detected at vertex {v})"
-            )
-        
-        # Step 3: Choose smallest color NOT used in B (opposite partition of v)
-        used_colors = set()
-        for u in B:
-            if u in color and color[u] is not None:
-                used_colors.add(color[u])
-        
-        c = 1
-        while c in used_colors:
-            c += 1
-        
+                    mask_side0[rv] |= mask_side1[ru]
+                    mask_side1[rv] |= mask_side0[ru]
+
+        # Bipartiteness check: every revealed neighbour must be opposite v
+        rv, pv = _find(parent, parity, v)
+        for u in revealed_neighbours:
+            _, pu = _find(parent, parity, u)
+            if pu == pv:
+                raise RuntimeError(
+                    f"Graph is not bipartite (odd cycle detected at vertex {v})"
+                )
+
+        # Smallest color not used on the opposite side of v's component:
+        # lowest zero bit of the opposite-side mask (bit 0 is pre-set
+        # since colors start at 1)
+        opposite = mask_side1[rv] if pv == 0 else mask_side0[rv]
+        inv = ~(opposite | 1)
+        c = (inv & -inv).bit_length() - 1
+
         color[v] = c
-        revealed.add(v)
-    
+        if pv == 0:
+            mask_side0[rv] |= 1 << c
+        else:
+            mask_side1[rv] |= 1 << c
+
     return color
@@ -4,27 +4,71 @@ Random k-colourable graph generator for COMP 6651 Project.
 Generates graphs by partitioning vertices into k independent sets.
 """
 
-import random
+import numpy as np
+from numba import njit
+
 from graph import Graph, save_to_edges_file
 
 
-def generate_k_colourable_graph(n, k, p):
+def _generate_bipartite(n, p, rng):
+    """
+    Specialization of generate_k_colourable_graph for k=2.
+
+    The partition-pair loops are fully unrolled for the single pair
+    (S[0], S[1]); random draws happen in the same order as the generic
+    path, so results are identical for a given generator state. k=2 is
+    the hot case since the CBIP experiments only use bipartite graphs.
+
+    Args:
+        n: Number of vertices (must be >= 2)
+        p: Edge probability for additional edges [0.0, 1.0]
+        rng: np.random.Generator supplying all draws
+
+    Returns:
+        (Graph, list[set]): Graph object and partition S
+    """
+    S = [{1}, {2}]
+    for v, i in zip(range(3, n + 1), rng.integers(0, 2, size=max(0, n - 2))):
+        S[i].add(v)
+
+    S0 = np.fromiter(sorted(S[0]), dtype=np.int32, count=len(S[0]))
+    S1 = np.fromiter(sorted(S[1]), dtype=np.int32, count=len(S[1]))
+
+    # Step 2: one mandatory partner per vertex, in each direction
+    partners0 = S1[rng.integers(0, S1.size, size=S0.size)]
+    partners1 = S0[rng.integers(0, S0.size, size=S1.size)]
+
+    # Step 3: Bernoulli mask over the single cross-partition pair
+    hit = rng.random((S0.size, S1.size)) < p
+    rows, cols = np.nonzero(hit)
+
+    g = Graph.from_edges(
+        n,
+        np.concatenate([S0, S1, S0[rows]]),
+        np.concatenate([partners0, partners1, S1[cols]]),
+    )
+    return g, S
+
+
+def generate_k_colourable_graph(n, k, p, rng=None):
     """
     Generate random k-colourable undirected graph.
-    
+
     Algorithm (from project spec):
         1. Partition vertices into k non-empty independent sets S[0..k-1]
         2. Add at least one edge from each vertex to each other partition
         3. Add additional edges between partitions with probability p
-    
+
     Args:
         n: Number of vertices (must be >= k)
         k: Number of independent sets (target chromatic number)
         p: Edge probability for additional edges [0.0, 1.0]
-        
+        rng: Optional np.random.Generator; pass one seeded with
+             np.random.default_rng(seed) for reproducible graphs
+
     Returns:
         (Graph, list[set]): Graph object and partition S
-        
+
     Raises:
         ValueError: If parameters are invalid
     """
@@ -34,90 +78,233 @@ def generate_k_colourable_graph(n, k, p):
         raise ValueError("k must be at least 1")
     if not (0.0 <= p <= 1.0):
         raise ValueError(f"p must be in [0.0, 1.0], got {p}")
-    
-    g = Graph(n)
+
+    if rng is None:
+        rng = np.random.default_rng()
+
+    specialized = _SPECIALIZED.get(k)
+    if specialized is not None:
+        return specialized(n, p, rng)
+
     S = [set() for _ in range(k)]
-    
-    # Step 1: Partition vertices ensuring no empty sets
-    counter = 0
+
+    # Step 1: Partition vertices ensuring no empty sets.
+    # First k vertices each seed their own partition; the rest are
+    # distributed by one batched draw.
+    for v in range(1, k + 1):
+        S[v - 1].add(v)
+    for v, i in zip(range(k + 1, n + 1), rng.integers(0, k, size=max(0, n - k))):
+        S[i].add(v)
+
+    S_arrays = [np.fromiter(sorted(S[i]), dtype=np.int32, count=len(S[i]))
+                for i in range(k)]
+
+    # Step 2: Mandatory edges - each vertex connects to each other partition.
+    # For each ordered pair (i, j), draw one random partner per vertex of
+    # S[i] in a single vectorized call; duplicates fall out at CSR
+    # finalization.
+    edge_us = []
+    edge_vs = []
+    for i in range(k):
+        for j in range(k):
+            if i == j:
+                continue
+            Si, Sj = S_arrays[i], S_arrays[j]
+            edge_us.append(Si)
+            edge_vs.append(Sj[rng.integers(0, Sj.size, size=Si.size)])
+
+    # Step 3: Additional edges with probability p, sampled as a Bernoulli
+    # mask per partition pair in one vectorized draw. Each unordered pair
+    # is visited once (i < j); overlap with Step 2 edges is deduplicated
+    # during CSR finalization.
+    for i in range(k):
+        for j in range(i + 1, k):
+            Si, Sj = S_arrays[i], S_arrays[j]
+            hit = rng.random((Si.size, Sj.size)) < p
+            rows, cols = np.nonzero(hit)
+            edge_us.append(Si[rows])
+            edge_vs.append(Sj[cols])
+
+    if edge_us:
+        g = Graph.from_edges(n, np.concatenate(edge_us), np.concatenate(edge_vs))
+    else:
+        g = Graph(n)  # k == 1: independent set, no edges
+    return g, S
+
+
+# Dispatch table for k-specialized generators
+_SPECIALIZED = {2: _generate_bipartite}
+
+
+@njit(cache=True)
+def _generate_kcol_csr(n, k, p):
+    """
+    Nopython port of generate_k_colourable_graph that emits CSR arrays
+    directly, for use inside compiled trial loops (see simulate.py).
+
+    Follows the same three steps as the Python generator — partition,
+    one mandatory partner per vertex per other partition, Bernoulli
+    extras — but draws scalars from Numba's per-thread RNG, so a given
+    seed does not reproduce the Python path (it doesn't need to: trial
+    seeds only have to make whole experiments repeatable).
+
+    Args:
+        n, k, p: As for generate_k_colourable_graph (k >= 1 assumed valid)
+
+    Returns:
+        (indptr, indices): int32 CSR adjacency arrays for vertices 1..n
+    """
+    # Step 1: partition labels; first k vertices seed the k sets
+    label = np.empty(n + 1, dtype=np.int32)
+    counts = np.zeros(k, dtype=np.int32)
     for v in range(1, n + 1):
-        if counter < k:
-            # First k vertices each get their own partition
-            S[counter].add(v)
-            counter += 1
-        else:
-            # Remaining vertices distributed randomly
-            idx = random.randint(0, k - 1)
-            S[idx].add(v)
-    
-    # Step 2: Mandatory edges - each vertex connects to each other partition
+        i = v - 1 if v <= k else np.random.randint(0, k)
+        label[v] = i
+        counts[i] += 1
+
+    # Partition members, grouped contiguously and ascending within a set
+    starts = np.zeros(k + 1, dtype=np.int32)
     for i in range(k):
-        for v in S[i]:
-            for j in range(k):
-                if i == j or len(S[j]) == 0:
-                    continue
-                # Pick random vertex from partition j
-                u = random.choice(list(S[j]))
-                if u not in g.adj[v]:
-                    g.add_edge(u, v)
-    
-    # Step 3: Additional edges with probability p
+        starts[i + 1] = starts[i] + counts[i]
+    members = np.empty(n, dtype=np.int32)
+    fill = starts[:k].copy()
+    for v in range(1, n + 1):
+        i = label[v]
+        members[fill[i]] = v
+        fill[i] += 1
+
+    # Upper bound on drawn edges: mandatory partners plus every cross pair
+    cross_pairs = 0
+    for i in range(k):
+        for j in range(i + 1, k):
+            cross_pairs += counts[i] * counts[j]
+    cap = n * (k - 1) + cross_pairs
+    eu = np.empty(cap, dtype=np.int64)
+    ev = np.empty(cap, dtype=np.int64)
+    m = 0
+
+    # Step 2: one mandatory partner per vertex, in each direction
     for i in range(k):
         for j in range(k):
             if i == j:
                 continue
-            for v in S[i]:
-                for u in S[j]:
-                    if u in g.adj[v]:
-                        continue
-                    if random.random() < p:
-                        g.add_edge(u, v)
-    
-    return g, S
+            for t in range(starts[i], starts[i + 1]):
+                eu[m] = members[t]
+                ev[m] = members[starts[j] + np.random.randint(0, counts[j])]
+                m += 1
+
+    # Step 3: additional cross-partition edges with probability p
+    for i in range(k):
+        for j in range(i + 1, k):
+            for a in range(starts[i], starts[i + 1]):
+                va = members[a]
+                for b in range(starts[j], starts[j + 1]):
+                    if np.random.random() < p:
+                        eu[m] = va
+                        ev[m] = members[b]
+                        m += 1
+
+    # CSR build: encode both directions, sort, dedup in one scan
+    base = np.int64(n + 1)
+    keys = np.empty(2 * m, dtype=np.int64)
+    for t in range(m):
+        keys[t] = eu[t] * base + ev[t]
+        keys[m + t] = ev[t] * base + eu[t]
+    keys = np.sort(keys)
+
+    indptr = np.zeros(n + 2, dtype=np.int32)
+    indices = np.empty(2 * m, dtype=np.int32)
+    cnt = 0
+    prev = np.int64(-1)
+    for t in range(2 * m):
+        key = keys[t]
+        if key != prev:
+            indices[cnt] = np.int32(key % base)
+            indptr[np.int64(key // base) + 1] += 1
+            cnt += 1
+            prev = key
+    for v in range(1, n + 2):
+        indptr[v] += indptr[v - 1]
+    return indptr, indices[:cnt].copy()
 
 
 def verify_partition(graph, partition):
     """
     Verify that partition forms valid k-colourable graph.
-    
+
+    Coverage and overlaps are checked with one labeling pass, and
+    independence with a single vectorized comparison of partition labels
+    across all CSR edges instead of per-pair membership tests.
+
     Args:
         graph: Graph object
         partition: List of vertex sets
-        
+
     Returns:
         (bool, str): (is_valid, error_message)
     """
-    k = len(partition)
-    
-    # Check all vertices are covered exactly once
-    all_vertices = set()
-    for s in partition:
-        all_vertices.update(s)
-    
-    if all_vertices != set(graph.vertices()):
-        return False, "Partition doesn't cover all vertices exactly"
-    
-    # Check for overlaps
-    for i in range(k):
-        for j in range(i + 1, k):
-            overlap = partition[i] & partition[j]
-            if overlap:
-                return False, f"Partitions {i} and {j} overlap: {overlap}"
-    
-    # Check independence (no internal edges within any partition)
+    n = graph.n
+    label = np.full(n + 1, -1, dtype=np.int32)
+
+    # Label each vertex with its partition index, catching overlaps
     for i, s in enumerate(partition):
-        for u in s:
-            for v in s:
-                if u != v and v in graph.neighbours(u):
-                    return False, f"Edge within partition {i}: ({u}, {v})"
-    
+        idx = np.fromiter(s, dtype=np.int64, count=len(s))
+        if idx.size and (idx.min() < 1 or idx.max() > n):
+            return False, "Partition doesn't cover all vertices exactly"
+        clash = idx[label[idx] != -1]
+        if clash.size:
+            j = int(label[clash[0]])
+            overlap = set(int(x) for x in clash)
+            return False, f"Partitions {j} and {i} overlap: {overlap}"
+        label[idx] = i
+
+    if n and (label[1:] == -1).any():
+        return False, "Partition doesn't cover all vertices exactly"
+
+    # Check independence: no edge may join two same-labeled endpoints
+    graph.finalize()
+    src = np.repeat(np.arange(n + 1, dtype=np.int32), np.diff(graph.indptr))
+    bad = np.flatnonzero(label[src] == label[graph.indices])
+    if bad.size:
+        u = int(src[bad[0]])
+        v = int(graph.indices[bad[0]])
+        return False, f"Edge within partition {int(label[u])}: ({u}, {v})"
+
     return True, "Valid k-colourable partition"
 
 
-def generate_and_save_many(n_values, k_values, p, N_per_setting, folder, rng_seed=None):
+def _generate_one_task(task):
+    """
+    Worker for generate_and_save_many: generate one graph and save it.
+
+    Args:
+        task: Tuple (n, k, p, filepath, seed, debug)
+
+    Returns:
+        str: Path of the written EDGES file
+    """
+    n, k, p, filepath, seed, debug = task
+    g, S = generate_k_colourable_graph(n, k, p, rng=np.random.default_rng(seed))
+
+    if debug:
+        # Verify partition (sanity check)
+        valid, msg = verify_partition(g, S)
+        if not valid:
+            raise RuntimeError(f"Generated invalid graph: {msg}")
+
+    save_to_edges_file(g, filepath)
+    return filepath
+
+
+def generate_and_save_many(n_values, k_values, p, N_per_setting, folder,
+                           rng_seed=None, debug=False):
     """
     Generate and save multiple graphs for experiments.
-    
+
+    Graphs are independent, so they are generated across a process pool;
+    each task gets its own seed derived from the base seed via
+    np.random.SeedSequence, keeping results reproducible.
+
     Args:
         n_values: List of vertex counts
         k_values: List of chromatic numbers
@@ -125,33 +312,30 @@ def generate_and_save_many(n_values, k_values, p, N_per_setting, folder, rng_see
         N_per_setting: Number of graphs per (k, n) combination
         folder: Output directory
         rng_seed: Optional base random seed
+        debug: Verify each generated partition (the generator is correct
+               by construction, so this is off by default)
     """
     import os
-    
-    if rng_seed is not None:
-        random.seed(rng_seed)
-    
+    import multiprocessing as mp
+
     os.makedirs(folder, exist_ok=True)
-    
+
     total = len(k_values) * len(n_values) * N_per_setting
-    count = 0
-    
+    seeds = np.random.SeedSequence(rng_seed).generate_state(total)
+
+    tasks = []
     for k in k_values:
         for n in n_values:
             for idx in range(N_per_setting):
-                g, S = generate_k_colourable_graph(n, k, p)
-                
-                # Verify partition (sanity check)
-                valid, msg = verify_partition(g, S)
-                if not valid:
-                    raise RuntimeError(f"Generated invalid graph: {msg}")
-                
                 filename = f"graph_k{k}_n{n}_idx{idx}.edges"
                 filepath = os.path.join(folder, filename)
-                save_to_edges_file(g, filepath)
-                
-                count += 1
-                if count % 100 == 0:
-                    print(f"  Generated {count}/{total} graphs")
-    
+                tasks.append((n, k, p, filepath, int(seeds[len(tasks)]), debug))
+
+    count = 0
+    with mp.Pool() as pool:
+        for _ in pool.imap_unordered(_generate_one_task, tasks, chunksize=8):
+            count += 1
+            if count % 100 == 0:
+                print(f"  Generated {count}/{total} graphs")
+
     print(f"Successfully generated {total} graphs in '{folder}/'")
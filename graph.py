@@ -1,61 +1,157 @@
 # graph.py
 """
 Graph data structure and EDGES I/O for COMP 6651 Online Graph Coloring Project.
-Undirected simple graphs with adjacency list representation.
+Undirected simple graphs stored in CSR (compressed sparse row) form.
 """
 
+import numpy as np
+
+
 class Graph:
     """
-    Undirected simple graph using adjacency lists.
+    Undirected simple graph stored as CSR arrays.
     Vertices are labeled with integers 1..n.
+
+    Edges are buffered as they are added; the CSR arrays (indptr, indices)
+    are built lazily on first neighbour/degree access via finalize().
+    Duplicate edges are removed during finalization.
     """
-    
+
     def __init__(self, n):
         """
         Initialize graph with n vertices.
-        
+
         Args:
             n: Number of vertices (non-negative integer)
-            
+
         Raises:
             ValueError: If n is negative
         """
         if n < 0:
             raise ValueError(f"Number of vertices must be non-negative, got {n}")
         self.n = n
-        self.adj = {i: set() for i in range(1, n + 1)}
-    
+        self._edge_u = []
+        self._edge_v = []
+        self._edge_batches = []  # (u_array, v_array) pairs from bulk adds
+        self.indptr = None
+        self.indices = None
+        self.degrees = None
+        self._dirty = True
+
+    @classmethod
+    def from_edges(cls, n, us, vs):
+        """
+        Build a graph directly from parallel edge arrays.
+
+        Args:
+            n: Number of vertices
+            us, vs: Array-likes of vertex labels (integers in [1, n])
+
+        Returns:
+            Graph object (finalized)
+        """
+        g = cls(n)
+        g.add_edges(us, vs)
+        g.finalize()
+        return g
+
     def add_edge(self, u, v):
         """
         Add undirected edge between vertices u and v.
         Self-loops are ignored. Duplicate edges handled automatically.
-        
+
         Args:
             u, v: Vertex labels (integers in [1, n])
-            
+
         Raises:
             ValueError: If vertices are out of range
         """
         if u == v:
             return  # Ignore self-loops
-        
+
         if u < 1 or v < 1 or u > self.n or v > self.n:
             raise ValueError(f"Vertices out of range: ({u}, {v}) with n={self.n}")
-        
-        self.adj[u].add(v)
-        self.adj[v].add(u)
-    
+
+        self._edge_u.append(u)
+        self._edge_v.append(v)
+        self._dirty = True
+
+    def add_edges(self, us, vs):
+        """
+        Add a batch of undirected edges given as parallel arrays.
+        Self-loops and duplicates are handled at finalization.
+
+        Args:
+            us, vs: Array-likes of vertex labels (integers in [1, n])
+
+        Raises:
+            ValueError: If any vertex is out of range
+        """
+        us = np.asarray(us)
+        vs = np.asarray(vs)
+        if us.size == 0:
+            return
+        if us.min() < 1 or vs.min() < 1 or us.max() > self.n or vs.max() > self.n:
+            raise ValueError(f"Vertices out of range in edge batch with n={self.n}")
+
+        keep = us != vs  # Ignore self-loops
+        self._edge_batches.append((us[keep], vs[keep]))
+        self._dirty = True
+
+    def finalize(self):
+        """
+        Build the CSR arrays (indptr, indices) from the buffered edge list.
+
+        Each undirected edge contributes both directions; duplicates are
+        dropped with a single np.unique pass over encoded (src, dst) keys.
+        Called automatically by neighbours()/degree() when edges changed.
+        """
+        if not self._dirty:
+            return
+
+        n = self.n
+        u_parts = [np.asarray(self._edge_u, dtype=np.int64)]
+        v_parts = [np.asarray(self._edge_v, dtype=np.int64)]
+        for us, vs in self._edge_batches:
+            u_parts.append(us.astype(np.int64))
+            v_parts.append(vs.astype(np.int64))
+        u = np.concatenate(u_parts)
+        v = np.concatenate(v_parts)
+
+        if u.size:
+            src = np.concatenate([u, v])
+            dst = np.concatenate([v, u])
+            # Encode (src, dst) pairs as single keys; unique sorts and dedups
+            keys = np.unique(src * (n + 1) + dst)
+            src = (keys // (n + 1)).astype(np.int32)
+            dst = (keys % (n + 1)).astype(np.int32)
+        else:
+            src = np.empty(0, dtype=np.int32)
+            dst = np.empty(0, dtype=np.int32)
+
+        deg = np.bincount(src, minlength=n + 1)
+        self.indptr = np.concatenate(
+            [[0], np.cumsum(deg)]
+        ).astype(np.int32)
+        self.indices = dst
+        self.degrees = deg.astype(np.int32)  # Indexed by vertex; degrees[0] unused
+        self._dirty = False
+
     def neighbours(self, v):
-        """Return set of neighbors of vertex v."""
-        return self.adj[v]
-    
+        """Return array of neighbors of vertex v (sorted, contiguous CSR slice)."""
+        if self._dirty:
+            self.finalize()
+        return self.indices[self.indptr[v]:self.indptr[v + 1]]
+
     def vertices(self):
         """Return list of all vertices."""
-        return list(self.adj.keys())
-    
+        return list(range(1, self.n + 1))
+
     def degree(self, v):
         """Return degree of vertex v."""
-        return len(self.adj[v])
+        if self._dirty:
+            self.finalize()
+        return int(self.indptr[v + 1] - self.indptr[v])
 
 
 def save_to_edges_file(graph, filepath):
@@ -64,47 +160,45 @@ def save_to_edges_file(graph, filepath):
     Each undirected edge {u,v} is stored as two directed lines:
         u v
         v u
-    
+
     Args:
         graph: Graph object to save
         filepath: Output file path
     """
-    written = set()
+    graph.finalize()
+    # Expand CSR rows to (src, dst) pairs and keep each edge once (u < v)
+    src = np.repeat(np.arange(graph.n + 1, dtype=np.int32),
+                    np.diff(graph.indptr))
+    dst = graph.indices
+    keep = src < dst
+    u = src[keep]
+    v = dst[keep]
+
+    # Interleave the two directed lines per edge, then write in one call
+    rows = np.empty((2 * u.size, 2), dtype=np.int32)
+    rows[0::2, 0] = u
+    rows[0::2, 1] = v
+    rows[1::2, 0] = v
+    rows[1::2, 1] = u
+
     with open(filepath, "w") as f:
-        for u in graph.adj:
-            for v in graph.adj[u]:
-                if (u, v) in written or (v, u) in written:
-                    continue
-                f.write(f"{u} {v}\n")
-                f.write(f"{v} {u}\n")
-                written.add((u, v))
+        np.savetxt(f, rows, fmt="%d")
 
 
 def load_from_edges_file(filepath):
     """
     Load graph from EDGES format file.
-    
+
     Args:
         filepath: Path to EDGES format file
-        
+
     Returns:
         Graph object
     """
-    edges = []
-    max_vertex = 0
-    
-    with open(filepath, "r") as f:
-        for line in f:
-            parts = line.strip().split()
-            if len(parts) != 2:
-                continue
-            u = int(parts[0])
-            v = int(parts[1])
-            edges.append((u, v))
-            max_vertex = max(max_vertex, u, v)
-    
-    g = Graph(max_vertex)
-    for u, v in edges:
-        g.add_edge(u, v)
-    
-    return g
+    arr = np.loadtxt(filepath, dtype=np.int32)
+    if arr.size == 0:
+        return Graph(0)
+
+    arr = arr.reshape(-1, 2)
+    # Both directed lines per edge are present; finalization deduplicates
+    return Graph.from_edges(int(arr.max()), arr[:, 0], arr[:, 1])
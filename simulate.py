@@ -4,48 +4,174 @@ Simulation framework for COMP 6651 Online Graph Coloring Project.
 Runs experiments and computes competitive ratio statistics.
 """
 
-import math
+import csv
+import io
+import multiprocessing as mp
+import os
 import random
-from generator import generate_k_colourable_graph
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from numba import njit, prange, set_num_threads, get_num_threads, get_thread_id
+
+from generator import generate_k_colourable_graph, _generate_kcol_csr
 from coloring import (
-    first_fit,
-    first_fit_degree,
-    first_fit_smallest_last,
     cbip,
-    validate_coloring
+    validate_coloring,
+    _color_all_three,
+    _proper_coloring_csr,
 )
 
 
-def stddev(data, mean):
+# Not cached: get_thread_id/get_num_threads bind ctypes pointers that
+# numba cannot serialize, so caching would only emit a warning
+@njit(parallel=True)
+def run_trials_batch(n, k, p, seeds, out_plain, out_deg, out_sl):
     """
-    Compute sample standard deviation.
-    
+    Run N full FirstFit-family trials (generate, color three ways,
+    validate) as one compiled kernel, parallelized over trials with
+    prange.
+
+    Each trial seeds its thread's RNG from seeds[t], so results depend
+    only on the seeds array, not on thread scheduling. All three variants
+    color the same graph. An invalid coloring (which would indicate a
+    kernel bug) is reported as -1 in the output slot for the caller to
+    raise on.
+
     Args:
-        data: List of numeric values
-        mean: Mean of the data
-        
+        n, k, p: Graph parameters, as for generate_k_colourable_graph
+        seeds: int64 array of per-trial seeds, length N
+        out_plain, out_deg, out_sl: int32 output arrays of length N,
+            receiving the max color used per trial by FirstFit, the
+            degree variant and the smallest-last variant
+    """
+    # Per-thread scratch reused across all trials a thread runs: three
+    # color buffers and one wide-path bitmap per worker instead of fresh
+    # allocations per trial. The wide path leaves its bitmap all False;
+    # _color_all_three resets the color buffers itself.
+    nthreads = get_num_threads()
+    color_buf = np.zeros((nthreads, 3, n + 1), dtype=np.int32)
+    used_buf = np.zeros((nthreads, n + 2), dtype=np.bool_)
+
+    for t in prange(seeds.shape[0]):
+        np.random.seed(seeds[t])
+        indptr, indices = _generate_kcol_csr(n, k, p)
+        # Reseed for the presentation order: keeping it on its own stream
+        # means color_trials_batch can replay cached graphs identically
+        np.random.seed(seeds[t] + 1)
+        tid = get_thread_id()
+        color_p = color_buf[tid, 0]
+        color_d = color_buf[tid, 1]
+        color_s = color_buf[tid, 2]
+        used_wide = used_buf[tid]
+
+        order = (np.random.permutation(n) + 1).astype(np.int32)
+        mx_p, mx_d, mx_s = _color_all_three(indptr, indices, n, order,
+                                            color_p, color_d, color_s,
+                                            used_wide)
+        if not _proper_coloring_csr(indptr, indices, color_p):
+            mx_p = -1
+        if not _proper_coloring_csr(indptr, indices, color_d):
+            mx_d = -1
+        if not _proper_coloring_csr(indptr, indices, color_s):
+            mx_s = -1
+        out_plain[t] = mx_p
+        out_deg[t] = mx_d
+        out_sl[t] = mx_s
+
+
+# Not cached: see run_trials_batch
+@njit(parallel=True)
+def color_trials_batch(n, seeds, indptr_all, indices_all, offsets,
+                       out_plain, out_deg, out_sl):
+    """
+    Color N pre-generated CSR graphs with the three FirstFit variants,
+    parallelized over trials like run_trials_batch but skipping
+    generation. Used for graphs replayed from the on-disk cache.
+
+    Args:
+        n: Number of vertices per graph
+        seeds: int64 per-trial seeds; trial t draws its presentation
+            order from seed seeds[t] + 1, matching run_trials_batch
+        indptr_all: (N, n+2) int32 array of stacked indptr rows
+        indices_all: 1-D int32 concatenation of all indices arrays
+        offsets: int64 array of length N+1 slicing indices_all per trial
+        out_plain, out_deg, out_sl: int32 output arrays, as for
+            run_trials_batch
+    """
+    nthreads = get_num_threads()
+    color_buf = np.zeros((nthreads, 3, n + 1), dtype=np.int32)
+    used_buf = np.zeros((nthreads, n + 2), dtype=np.bool_)
+
+    for t in prange(seeds.shape[0]):
+        indptr = indptr_all[t]
+        indices = indices_all[offsets[t]:offsets[t + 1]]
+        np.random.seed(seeds[t] + 1)
+        tid = get_thread_id()
+        color_p = color_buf[tid, 0]
+        color_d = color_buf[tid, 1]
+        color_s = color_buf[tid, 2]
+        used_wide = used_buf[tid]
+
+        order = (np.random.permutation(n) + 1).astype(np.int32)
+        mx_p, mx_d, mx_s = _color_all_three(indptr, indices, n, order,
+                                            color_p, color_d, color_s,
+                                            used_wide)
+        if not _proper_coloring_csr(indptr, indices, color_p):
+            mx_p = -1
+        if not _proper_coloring_csr(indptr, indices, color_d):
+            mx_d = -1
+        if not _proper_coloring_csr(indptr, indices, color_s):
+            mx_s = -1
+        out_plain[t] = mx_p
+        out_deg[t] = mx_d
+        out_sl[t] = mx_s
+
+
+@njit(cache=True)
+def _generate_trial_csr(n, k, p, seed):
+    """Seed the compiled RNG and generate one trial's CSR graph."""
+    np.random.seed(seed)
+    return _generate_kcol_csr(n, k, p)
+
+
+def _cbip_trial(args):
+    """
+    Worker for run_cbip: one bipartite graph through CBIP.
+
+    Args:
+        args: Tuple (n, p, seed)
+
     Returns:
-        float: Sample standard deviation (N-1 denominator)
+        int: Max color used
     """
-    if len(data) <= 1:
-        return 0.0
-    variance = sum((x - mean) ** 2 for x in data) / (len(data) - 1)
-    return math.sqrt(variance)
+    n, p, seed = args
+    random.seed(seed)  # cbip's presentation-order shuffle
+    g, _ = generate_k_colourable_graph(n, 2, p, rng=np.random.default_rng(seed))
+
+    c_cbip = cbip(g)
+    ok, msg = validate_coloring(g, c_cbip)
+    if not ok:
+        raise RuntimeError(f"Invalid CBIP coloring: {msg}")
+
+    return int(c_cbip.max())
 
 
 def competitive_stats(ratios):
     """
-    Compute statistics for competitive ratios.
-    
+    Compute statistics for competitive ratios in one vectorized pass.
+
     Args:
-        ratios: List of competitive ratio values
-        
+        ratios: Array-like of competitive ratio values
+
     Returns:
-        tuple: (avg, sd, min, max)
+        tuple: (avg, sd, min, max) with sd the sample standard deviation
+        (N-1 denominator; 0.0 for fewer than two values)
     """
-    avg = sum(ratios) / len(ratios)
-    sd = stddev(ratios, avg)
-    return avg, sd, min(ratios), max(ratios)
+    r = np.asarray(ratios, dtype=np.float64)
+    sd = float(np.std(r, ddof=1)) if r.size > 1 else 0.0
+    return float(r.mean()), sd, float(r.min()), float(r.max())
 
 
 class ExperimentRunner:
@@ -53,22 +179,71 @@ class ExperimentRunner:
     Manages and runs coloring algorithm experiments.
     """
     
-    def __init__(self, rng_seed=None, verbose=True):
+    def __init__(self, rng_seed=None, verbose=True, cache_dir=None):
         """
         Initialize experiment runner.
-        
+
         Args:
             rng_seed: Base random seed for reproducibility
             verbose: Print progress messages
+            cache_dir: Optional directory for the on-disk graph cache.
+                When set, generated FirstFit-family graphs are stored as
+                one .npz per (k, n, p, seed, N) setting and replayed on
+                later runs instead of being regenerated.
         """
         self.verbose = verbose
-        if rng_seed is not None:
-            random.seed(rng_seed)
+        self.rng_seed = rng_seed
+        self.cache_dir = cache_dir
+        # One PCG64 generator owned by the runner; per-trial seeds are
+        # drawn from it instead of reseeding module-global RNG state
+        self.rng = np.random.default_rng(rng_seed)
     
     def _log(self, message):
         """Print message if verbose mode enabled."""
         if self.verbose:
             print(message)
+
+    def _load_or_generate_graphs(self, n, k, p, N, seeds):
+        """
+        Fetch one (k, n) setting's graphs from the on-disk cache, or
+        generate and store them.
+
+        The cache file also records the per-trial seeds so a cached
+        setting is self-consistent: replays color exactly the graphs
+        that were stored, with the presentation orders derived from the
+        stored seeds.
+
+        Args:
+            n, k, p, N: Experiment setting
+            seeds: int64 per-trial seeds to use on a cache miss
+
+        Returns:
+            tuple: (seeds, indptr_all, indices_all, offsets) in the
+            stacked layout color_trials_batch expects
+        """
+        filename = f"graphs_k{k}_n{n}_p{p}_seed{self.rng_seed}_N{N}.npz"
+        path = os.path.join(self.cache_dir, filename)
+
+        if os.path.exists(path):
+            self._log(f"  (graphs loaded from cache: {filename})")
+            with np.load(path) as data:
+                return (data["seeds"], data["indptr"], data["indices"],
+                        data["offsets"])
+
+        indptr_all = np.empty((N, n + 2), dtype=np.int32)
+        parts = []
+        offsets = np.zeros(N + 1, dtype=np.int64)
+        for t in range(N):
+            indptr, indices = _generate_trial_csr(n, k, p, seeds[t])
+            indptr_all[t] = indptr
+            parts.append(indices)
+            offsets[t + 1] = offsets[t] + indices.size
+        indices_all = np.concatenate(parts)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        np.savez_compressed(path, seeds=seeds, indptr=indptr_all,
+                            indices=indices_all, offsets=offsets)
+        return seeds, indptr_all, indices_all, offsets
     
     def run_firstfit_family(self, n_values, k_values, p, N):
         """
@@ -97,59 +272,48 @@ class ExperimentRunner:
                 count += 1
                 self._log(f"[{count}/{total_experiments}] FirstFit family: k={k}, n={n}")
                 
-                ratios_plain = []
-                ratios_deg = []
-                ratios_sl = []
-                
-                for _ in range(N):
-                    # Generate one graph
-                    g, _ = generate_k_colourable_graph(n, k, p)
-                    
-                    # Test all three algorithms on the SAME graph
-                    
-                    # 1. FirstFit (random order)
-                    c_plain = first_fit(g)
-                    ok, msg = validate_coloring(g, c_plain)
-                    if not ok:
-                        raise RuntimeError(f"Invalid FirstFit coloring: {msg}")
-                    max_plain = max(c_plain.values())
-                    
-                    # 2. FirstFit + Degree heuristic
-                    c_deg = first_fit_degree(g)
-                    ok, msg = validate_coloring(g, c_deg)
-                    if not ok:
-                        raise RuntimeError(f"Invalid FirstFit+Degree coloring: {msg}")
-                    max_deg = max(c_deg.values())
-                    
-                    # 3. FirstFit + Smallest-Last heuristic
-                    c_sl = first_fit_smallest_last(g)
-                    ok, msg = validate_coloring(g, c_sl)
-                    if not ok:
-                        raise RuntimeError(f"Invalid FirstFit+SmallestLast coloring: {msg}")
-                    max_sl = max(c_sl.values())
-                    
-                    # Assumption: χ(G) ≈ k for generated k-colourable graphs
-                    chi_est = k
-                    ratios_plain.append(max_plain / float(chi_est))
-                    ratios_deg.append(max_deg / float(chi_est))
-                    ratios_sl.append(max_sl / float(chi_est))
-                
-                # Compute statistics for each algorithm
-                for name, ratios in [
-                    ("FirstFit", ratios_plain),
-                    ("FirstFit+Degree", ratios_deg),
-                    ("FirstFit+SmallestLast", ratios_sl)
+                # Per-trial seeds derived from the runner's seeded RNG keep
+                # results reproducible regardless of thread scheduling
+                seeds = self.rng.integers(0, 2**31 - 1, size=N)
+                out_plain = np.empty(N, dtype=np.int32)
+                out_deg = np.empty(N, dtype=np.int32)
+                out_sl = np.empty(N, dtype=np.int32)
+
+                set_num_threads(os.cpu_count() or 1)
+                if self.cache_dir is not None:
+                    seeds, indptr_all, indices_all, offsets = \
+                        self._load_or_generate_graphs(n, k, p, N, seeds)
+                    color_trials_batch(n, seeds, indptr_all, indices_all,
+                                       offsets, out_plain, out_deg, out_sl)
+                else:
+                    run_trials_batch(n, k, p, seeds,
+                                     out_plain, out_deg, out_sl)
+                if min(out_plain.min(), out_deg.min(), out_sl.min()) <= 0:
+                    raise RuntimeError(
+                        "Invalid coloring produced in compiled trial batch")
+
+                # Assumption: χ(G) ≈ k for generated k-colourable graphs.
+                # Stats are computed on the raw integer color counts and
+                # the four scalars divided by chi once, instead of
+                # dividing every per-trial count first (stddev scales
+                # linearly, so the results agree).
+                chi_est = k
+
+                for name, maxes in [
+                    ("FirstFit", out_plain),
+                    ("FirstFit+Degree", out_deg),
+                    ("FirstFit+SmallestLast", out_sl)
                 ]:
-                    avg, sd, mn, mx = competitive_stats(ratios)
+                    avg, sd, mn, mx = competitive_stats(maxes)
                     results.append({
                         "Algorithm": name,
                         "k": k,
                         "n": n,
                         "N": N,
-                        "avg_ratio": avg,
-                        "sd_ratio": sd,
-                        "min_ratio": mn,
-                        "max_ratio": mx
+                        "avg_ratio": avg / chi_est,
+                        "sd_ratio": sd / chi_est,
+                        "min_ratio": mn / chi_est,
+                        "max_ratio": mx / chi_est
                     })
         
         return results
@@ -172,70 +336,79 @@ class ExperimentRunner:
         for idx, n in enumerate(n_values):
             self._log(f"[{idx+1}/{len(n_values)}] CBIP: k=2, n={n}")
             
-            ratios = []
-            
-            for _ in range(N):
-                g, _ = generate_k_colourable_graph(n, k, p)
-                
-                c_cbip = cbip(g)
-                ok, msg = validate_coloring(g, c_cbip)
-                if not ok:
-                    raise RuntimeError(f"Invalid CBIP coloring: {msg}")
-                
-                max_c = max(c_cbip.values())
-                # For bipartite graphs, χ(G) = 2 exactly
-                chi_exact = 2
-                ratios.append(max_c / float(chi_exact))
-            
-            avg, sd, mn, mx = competitive_stats(ratios)
+            seeds = self.rng.integers(0, 2**31 - 1, size=N)
+            tasks = [(n, p, int(s)) for s in seeds]
+
+            # Spawned (not forked) workers: forking after the Numba thread
+            # pool has started (run_trials_batch) leaves children with a
+            # broken copy of its threading state and hangs shutdown
+            cpu = os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=cpu,
+                                     mp_context=mp.get_context("spawn")) as ex:
+                maxes = list(ex.map(_cbip_trial, tasks,
+                                    chunksize=max(1, N // (4 * cpu))))
+
+            # For bipartite graphs, χ(G) = 2 exactly; stats over the raw
+            # counts, divided by chi once (as in run_firstfit_family)
+            chi_exact = 2
+
+            avg, sd, mn, mx = competitive_stats(np.asarray(maxes, dtype=np.int32))
             results.append({
                 "Algorithm": "CBIP",
                 "k": k,
                 "n": n,
                 "N": N,
-                "avg_ratio": avg,
-                "sd_ratio": sd,
-                "min_ratio": mn,
-                "max_ratio": mx
+                "avg_ratio": avg / chi_exact,
+                "sd_ratio": sd / chi_exact,
+                "min_ratio": mn / chi_exact,
+                "max_ratio": mx / chi_exact
             })
         
         return results
 
 
+# Column order shared by the results table and the CSV writer
+FIELDNAMES = ["Algorithm", "k", "n", "N", "avg_ratio", "sd_ratio",
+              "min_ratio", "max_ratio"]
+
+
 def print_results_table(results):
     """
     Print results in CSV-like table format.
-    
+
+    The whole table is assembled in a string buffer and written with one
+    stdout call instead of a print per row.
+
     Args:
         results: List of result dictionaries
     """
-    print("Algorithm,k,n,N,avg_ratio,sd_ratio,min_ratio,max_ratio")
-    for r in results:
-        print(
-            f"{r['Algorithm']},{r['k']},{r['n']},{r['N']},"
-            f"{r['avg_ratio']:.4f},{r['sd_ratio']:.4f},"
-            f"{r['min_ratio']:.4f},{r['max_ratio']:.4f}"
-        )
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=FIELDNAMES, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(
+        {**r,
+         "avg_ratio": format(r["avg_ratio"], ".4f"),
+         "sd_ratio": format(r["sd_ratio"], ".4f"),
+         "min_ratio": format(r["min_ratio"], ".4f"),
+         "max_ratio": format(r["max_ratio"], ".4f")}
+        for r in results
+    )
+    sys.stdout.write(buf.getvalue())
 
 
 def save_results_to_csv(results, filepath):
     """
     Save results to CSV file.
-    
+
     Args:
         results: List of result dictionaries
         filepath: Output CSV file path
     """
-    import csv
-    
     if not results:
         return
-    
-    fieldnames = ["Algorithm", "k", "n", "N", "avg_ratio", "sd_ratio", 
-                  "min_ratio", "max_ratio"]
-    
-    with open(filepath, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+
+    # Large write buffer plus writerows: one syscall instead of one per row
+    with open(filepath, "w", newline="", buffering=1 << 20) as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
         writer.writeheader()
-        for r in results:
-            writer.writerow(r)
+        writer.writerows(results)
@@ -38,44 +38,43 @@ def test_graph_basic():
 
 def test_generator_partition():
     """Test that generator creates valid k-colourable graphs."""
+    import numpy as np
+
     n, k, p = 30, 3, 0.3
     g, S = generate_k_colourable_graph(n, k, p)
-    
+
     # Verify partition
     valid, msg = verify_partition(g, S)
     assert valid, f"Invalid partition: {msg}"
-    
-    # Check no internal edges in any partition
+
+    # Check no internal edges in any partition: one C-level isin per
+    # vertex against its own partition instead of a quadratic Python loop
     for i, subset in enumerate(S):
+        subset_arr = np.fromiter(subset, dtype=np.int32, count=len(subset))
         for v in subset:
-            for u in subset:
-                if u != v:
-                    assert u not in g.adj[v], f"Edge within partition {i}: ({u}, {v})"
-    
+            assert not np.isin(g.neighbours(v), subset_arr).any(), \
+                f"Edge within partition {i} at vertex {v}"
+
     print("✓ Generator: creates valid k-colourable graphs")
 
 
 def test_generator_reproducibility():
     """Test that same seed produces same graphs."""
-    import random
-    
-    random.seed(123)
-    g1, _ = generate_k_colourable_graph(20, 2, 0.3)
-    edges1 = set()
-    for u in g1.adj:
-        for v in g1.adj[u]:
-            if u < v:
-                edges1.add((u, v))
-    
-    random.seed(123)
-    g2, _ = generate_k_colourable_graph(20, 2, 0.3)
-    edges2 = set()
-    for u in g2.adj:
-        for v in g2.adj[u]:
-            if u < v:
-                edges2.add((u, v))
-    
-    assert edges1 == edges2, "Same seed should produce same graph"
+    import numpy as np
+
+    g1, _ = generate_k_colourable_graph(20, 2, 0.3,
+                                        rng=np.random.default_rng(123))
+    g2, _ = generate_k_colourable_graph(20, 2, 0.3,
+                                        rng=np.random.default_rng(123))
+
+    # CSR arrays are deterministic for a given seed, so compare them
+    # directly instead of materializing per-edge tuples
+    g1.finalize()
+    g2.finalize()
+    assert np.array_equal(g1.indptr, g2.indptr), \
+        "Same seed should produce same graph"
+    assert np.array_equal(g1.indices, g2.indices), \
+        "Same seed should produce same graph"
     
     print("✓ Generator: reproducible with seed")
 
@@ -92,7 +91,7 @@ def test_firstfit_path():
     assert ok, f"Invalid FirstFit coloring on path: {msg}"
     
     # Path should need at most 2 colors
-    max_color = max(c.values())
+    max_color = int(c.max())
     assert max_color <= 3, f"Path used {max_color} colors (expected ≤ 2)"
     
     print("✓ FirstFit: path graph")
@@ -110,7 +109,7 @@ def test_firstfit_triangle():
     assert ok, f"Invalid FirstFit coloring on triangle: {msg}"
     
     # Triangle needs exactly 3 colors
-    max_color = max(c.values())
+    max_color = int(c.max())
     assert max_color == 3, f"Triangle used {max_color} colors (expected 3)"
     
     print("✓ FirstFit: triangle (K_3)")
@@ -128,7 +127,7 @@ def test_firstfit_bipartite():
     assert ok, f"Invalid FirstFit coloring on K_3,3: {msg}"
     
     # K_3,3 needs 2 colors optimally, FirstFit might use more
-    max_color = max(c.values())
+    max_color = int(c.max())
     assert max_color <= 4, f"K_3,3 used {max_color} colors (expected ≤ 4)"
     
     print("✓ FirstFit: complete bipartite K_3,3")
@@ -169,7 +168,7 @@ def test_cbip_bipartite():
     assert ok, f"Invalid CBIP coloring on K_3,3: {msg}"
     
     # CBIP should use exactly 2 colors for bipartite
-    max_color = max(c.values())
+    max_color = int(c.max())
     assert max_color == 2, f"CBIP used {max_color} colors on bipartite (expected 2)"
     
     print("✓ CBIP: complete bipartite K_3,3")
@@ -184,7 +183,7 @@ def test_cbip_generated():
     assert ok, f"Invalid CBIP coloring on generated k=2 graph: {msg}"
     
     # Should use small number of colors
-    max_color = max(c.values())
+    max_color = int(c.max())
     assert max_color <= 4, f"CBIP used {max_color} colors (expected ≤ 4)"
     
     print("✓ CBIP: generated k=2 graph")
@@ -208,17 +207,19 @@ def test_cbip_detects_nonbipartite():
 
 def test_validation():
     """Test coloring validation function."""
+    import numpy as np
+
     g = Graph(3)
     g.add_edge(1, 2)
     g.add_edge(2, 3)
-    
-    # Valid coloring
-    valid_coloring = {1: 1, 2: 2, 3: 1}
+
+    # Valid coloring (entry 0 unused)
+    valid_coloring = np.array([0, 1, 2, 1], dtype=np.int32)
     ok, msg = validate_coloring(g, valid_coloring)
     assert ok, f"Should accept valid coloring: {msg}"
-    
+
     # Invalid coloring (adjacent vertices share color)
-    invalid_coloring = {1: 1, 2: 1, 3: 2}
+    invalid_coloring = np.array([0, 1, 1, 2], dtype=np.int32)
     ok, msg = validate_coloring(g, invalid_coloring)
     assert not ok, "Should reject invalid coloring"
     assert "1" in msg and "2" in msg  # Should mention vertices 1 and 2
@@ -228,31 +229,24 @@ def test_validation():
 
 def test_heuristics_improve_firstfit():
     """Test that heuristics generally improve over plain FirstFit."""
-    # Generate several graphs and check average improvement
-    improvements_deg = []
-    improvements_sl = []
-    
-    for _ in range(10):
-        g, _ = generate_k_colourable_graph(50, 3, 0.3)
-        
-        c_plain = first_fit(g)
-        c_deg = first_fit_degree(g)
-        c_sl = first_fit_smallest_last(g)
-        
-        colors_plain = max(c_plain.values())
-        colors_deg = max(c_deg.values())
-        colors_sl = max(c_sl.values())
-        
-        improvements_deg.append(colors_plain - colors_deg)
-        improvements_sl.append(colors_plain - colors_sl)
-    
-    avg_improvement_deg = sum(improvements_deg) / len(improvements_deg)
-    avg_improvement_sl = sum(improvements_sl) / len(improvements_sl)
-    
+    from simulate import ExperimentRunner
+
+    # One batch call runs all three variants on the same 10 graphs,
+    # reusing the simulator's compiled trial kernel
+    runner = ExperimentRunner(rng_seed=7, verbose=False)
+    results = {r["Algorithm"]: r for r in
+               runner.run_firstfit_family([50], [3], 0.3, 10)}
+
+    k = 3  # avg_ratio = avg colors / k, so improvements scale back by k
+    avg_improvement_deg = (results["FirstFit"]["avg_ratio"]
+                           - results["FirstFit+Degree"]["avg_ratio"]) * k
+    avg_improvement_sl = (results["FirstFit"]["avg_ratio"]
+                          - results["FirstFit+SmallestLast"]["avg_ratio"]) * k
+
     # Heuristics should generally not increase colors (allow small margin)
     assert avg_improvement_deg >= -0.5, "Degree heuristic should not significantly worsen results"
     assert avg_improvement_sl >= -0.5, "Smallest-last should not significantly worsen results"
-    
+
     print(f"✓ Heuristics: Degree improves by {avg_improvement_deg:.2f} colors on average")
     print(f"✓ Heuristics: Smallest-Last improves by {avg_improvement_sl:.2f} colors on average")
 